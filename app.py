@@ -18,12 +18,15 @@ Versión: 2.0 - Con Cálculo Inteligente de Fuentes
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
 import plotly.graph_objects as go
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import collections
 import math
 from PIL import Image
 import os
+from nucleos import ffd_core, asignar_fuentes
 
 # ============================================================================
 # CONFIGURACIÓN DE LA PÁGINA
@@ -40,200 +43,15 @@ st.set_page_config(
 # ESTILOS PERSONALIZADOS
 # ============================================================================
 
-st.markdown("""
-<style>
-    /* Forzar transparencia en todas las imágenes */
-    img {
-        background: white !important;
-        background-color: white !important;
-        padding: 15px;
-        border-radius: 12px;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* Contenedor de imágenes sin fondo */
-    [data-testid="stImage"] {
-        background: transparent !important;
-    }
-    
-    /* Importar fuentes distintivas */
-    @import url('https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;700&family=Work+Sans:wght@300;500;700&display=swap');
-    
-    /* Variables CSS */
-    :root {
-        --primary-color: #0f172a;
-        --secondary-color: #475569;
-        --accent-color: #f97316;
-        --success-color: #10b981;
-        --warning-color: #f59e0b;
-        --bg-color: #f8fafc;
-        --card-bg: #ffffff;
-    }
-    
-    /* Tipografía general */
-    html, body, [class*="css"] {
-        font-family: 'Work Sans', sans-serif;
-        color: var(--primary-color);
-    }
-    
-    /* Títulos */
-    h1, h2, h3 {
-        font-family: 'Work Sans', sans-serif;
-        font-weight: 700;
-        letter-spacing: -0.02em;
-    }
-    
-    h1 {
-        color: var(--primary-color);
-        font-size: 2.5rem !important;
-        margin-bottom: 0.5rem !important;
-    }
-    
-    /* Código y números */
-    code, .stNumberInput input, .metric-value {
-        font-family: 'JetBrains Mono', monospace !important;
-    }
-    
-    /* Fondo de la aplicación */
-    .main {
-        background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
-    }
-    
-    /* Tarjetas personalizadas */
-    .custom-card {
-        background: var(--card-bg);
-        padding: 1.5rem;
-        border-radius: 12px;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
-        border-left: 4px solid var(--accent-color);
-        margin-bottom: 1rem;
-        transition: transform 0.2s ease, box-shadow 0.2s ease;
-    }
-    
-    .custom-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05);
-    }
-    
-    /* Métricas personalizadas */
-    [data-testid="stMetricValue"] {
-        font-size: 2rem !important;
-        font-weight: 700 !important;
-        color: var(--accent-color) !important;
-        font-family: 'JetBrains Mono', monospace !important;
-    }
-    
-    [data-testid="stMetricLabel"] {
-        font-size: 0.9rem !important;
-        font-weight: 500 !important;
-        color: var(--secondary-color) !important;
-        text-transform: uppercase;
-        letter-spacing: 0.05em;
-    }
-    
-    /* Botones */
-    .stButton > button {
-        background: linear-gradient(135deg, var(--accent-color) 0%, #ea580c 100%);
-        color: white;
-        border: none;
-        padding: 0.75rem 2rem;
-        border-radius: 8px;
-        font-weight: 600;
-        font-size: 1rem;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 6px -1px rgba(249, 115, 22, 0.3);
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 10px 15px -3px rgba(249, 115, 22, 0.4);
-        background: linear-gradient(135deg, #ea580c 0%, #c2410c 100%);
-    }
-    
-    /* Inputs */
-    .stNumberInput > div > div > input {
-        border-radius: 8px;
-        border: 2px solid #e2e8f0;
-        padding: 0.75rem;
-        font-size: 1rem;
-        transition: border-color 0.2s ease;
-        color: #0f172a !important;
-        background-color: #ffffff !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Forzar color en inputs del sidebar */
-    [data-testid="stSidebar"] .stNumberInput > div > div > input {
-        color: #0f172a !important;
-        background-color: #ffffff !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Labels de inputs en sidebar */
-    [data-testid="stSidebar"] label {
-        color: #ffffff !important;
-    }
-    
-    .stNumberInput > div > div > input:focus {
-        border-color: var(--accent-color);
-        box-shadow: 0 0 0 3px rgba(249, 115, 22, 0.1);
-    }
-    
-    /* Tablas */
-    .dataframe {
-        border-radius: 8px;
-        overflow: hidden;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* Sidebar */
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, var(--primary-color) 0%, #1e293b 100%);
-    }
-    
-    /* Solo títulos y textos en blanco, NO inputs */
-    [data-testid="stSidebar"] h1,
-    [data-testid="stSidebar"] h2,
-    [data-testid="stSidebar"] h3,
-    [data-testid="stSidebar"] h4,
-    [data-testid="stSidebar"] p,
-    [data-testid="stSidebar"] span:not(.stNumberInput span),
-    [data-testid="stSidebar"] label,
-    [data-testid="stSidebar"] .stMarkdown {
-        color: white !important;
-    }
-    
-    /* Alertas */
-    .stAlert {
-        border-radius: 8px;
-        border-left: 4px solid;
-    }
-    
-    /* Animaciones */
-    @keyframes slideIn {
-        from {
-            opacity: 0;
-            transform: translateY(20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    .custom-card {
-        animation: slideIn 0.4s ease-out;
-    }
-    
-    /* Divisor decorativo */
-    .custom-divider {
-        height: 3px;
-        background: linear-gradient(90deg, var(--accent-color) 0%, transparent 100%);
-        margin: 2rem 0;
-        border-radius: 2px;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_data(show_spinner=False)
+def cargar_estilos() -> str:
+    """Lee la hoja de estilos una sola vez; las siguientes ejecuciones usan la caché."""
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "styles.css")
+    with open(ruta, encoding="utf-8") as archivo:
+        return archivo.read()
+
+
+st.markdown(f"<style>{cargar_estilos()}</style>", unsafe_allow_html=True)
 
 # ============================================================================
 # CLASES Y ESTRUCTURAS DE DATOS
@@ -242,6 +60,8 @@ st.markdown("""
 class Pedido:
     """Representa un pedido individual de piezas."""
     
+    __slots__ = ('largo', 'cantidad')
+    
     def __init__(self, largo: float, cantidad: int):
         self.largo = largo
         self.cantidad = cantidad
@@ -253,42 +73,95 @@ class Pedido:
 class Rollo:
     """Representa un rollo madre con las piezas cortadas."""
     
+    __slots__ = ('longitud_total', 'piezas', 'fines', 'espacio_usado', 'desperdicio', 'eficiencia')
+    
     def __init__(self, longitud_total: float):
         self.longitud_total = longitud_total
-        self.piezas: List[float] = []
+        self.piezas: np.ndarray = np.empty(0)
+        # Posición donde termina cada pieza (suma acumulada de los largos)
+        self.fines: np.ndarray = np.empty(0)
         self.espacio_usado = 0.0
+        self.actualizar_metricas()
     
-    def puede_agregar(self, largo_pieza: float) -> bool:
-        """Verifica si una pieza puede agregarse al rollo."""
-        return (self.espacio_usado + largo_pieza) <= self.longitud_total
-    
-    def agregar_pieza(self, largo_pieza: float) -> bool:
-        """Agrega una pieza al rollo si hay espacio."""
-        if self.puede_agregar(largo_pieza):
-            self.piezas.append(largo_pieza)
-            self.espacio_usado += largo_pieza
-            return True
-        return False
-    
-    @property
-    def desperdicio(self) -> float:
-        """Calcula el desperdicio del rollo."""
-        return self.longitud_total - self.espacio_usado
-    
-    @property
-    def eficiencia(self) -> float:
-        """Calcula el porcentaje de eficiencia del rollo."""
-        return (self.espacio_usado / self.longitud_total) * 100 if self.longitud_total > 0 else 0
+    def actualizar_metricas(self):
+        """Recalcula el desperdicio y el porcentaje de eficiencia del rollo."""
+        self.desperdicio = self.longitud_total - self.espacio_usado
+        self.eficiencia = (self.espacio_usado / self.longitud_total) * 100 if self.longitud_total > 0 else 0
 
 
 # ============================================================================
 # ALGORITMO DE OPTIMIZACIÓN
 # ============================================================================
 
+# Escalas para cuantizar largos (metros -> milímetros) y consumos (W -> mW)
+ESCALA_MM = 1000
+ESCALA_MW = 1000
+
+
+def _cuantizar(valores: np.ndarray, escala: int) -> Optional[np.ndarray]:
+    """
+    Convierte valores reales a enteros en la escala indicada (ej: milímetros).
+    
+    Returns:
+        Arreglo de enteros, o None si algún valor no es entero en esa escala
+    """
+    escalados = np.round(valores * escala)
+    if not np.allclose(escalados, valores * escala, rtol=0, atol=1e-6):
+        return None
+    return escalados.astype(np.int64)
+
+
+def _ffd_un_largo(pieza, cantidad: int,
+                  longitud_rollo) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Caso particular del FFD en que todas las piezas tienen el mismo largo.
+    
+    Cada rollo lleva floor(longitud_rollo / pieza) piezas y el último, el
+    resto; se calcula directamente y devuelve lo mismo que ffd_core.
+    """
+    por_rollo = max(1, int(longitud_rollo // pieza))
+    while por_rollo > 1 and por_rollo * pieza > longitud_rollo:
+        por_rollo -= 1
+    
+    llenos, resto = divmod(int(cantidad), por_rollo)
+    seg_cantidad = np.full(llenos + (resto > 0), por_rollo, dtype=np.int64)
+    if resto > 0:
+        seg_cantidad[-1] = resto
+    
+    seg_rollo = np.arange(len(seg_cantidad), dtype=np.int64)
+    seg_largo = np.zeros(len(seg_cantidad), dtype=np.int64)
+    restantes = longitud_rollo - seg_cantidad * pieza
+    return seg_rollo, seg_largo, seg_cantidad, restantes
+
+
+def _asignar_fuentes_un_consumo(consumo: float, cantidad: int,
+                                fuentes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Caso particular de asignar_fuentes en que todas las piezas consumen lo mismo.
+    
+    Todas usan la fuente más pequeña que las soporta (o la más grande): cada
+    fuente lleva floor(potencia / consumo) piezas y la última, el resto.
+    """
+    tipo = min(int(np.searchsorted(fuentes, consumo)), len(fuentes) - 1)
+    potencia = fuentes[tipo]
+    por_fuente = max(1, int(potencia // consumo))
+    while por_fuente > 1 and por_fuente * consumo > potencia:
+        por_fuente -= 1
+    
+    asignacion = np.arange(cantidad, dtype=np.int64) // por_fuente
+    piezas_por_fuente = np.bincount(asignacion)
+    tipos = np.full(len(piezas_por_fuente), tipo, dtype=np.int64)
+    restantes = potencia - piezas_por_fuente * consumo
+    return asignacion, tipos, restantes
+
+
 def first_fit_decreasing(pedidos: List[Pedido], longitud_rollo: float) -> List[Rollo]:
     """
     Implementa el algoritmo First Fit Decreasing (FFD).
     
+    El empaquetado se hace en nucleos.ffd_core sobre arreglos de NumPy; los
+    objetos Rollo se construyen al final, solo para la visualización.
+    
     Args:
         pedidos: Lista de pedidos con largo y cantidad
         longitud_rollo: Longitud del rollo madre
@@ -296,40 +169,167 @@ def first_fit_decreasing(pedidos: List[Pedido], longitud_rollo: float) -> List[R
     Returns:
         Lista de rollos con las piezas asignadas
     """
-    # Expandir pedidos a lista de piezas individuales
-    piezas = []
-    for pedido in pedidos:
-        piezas.extend([pedido.largo] * pedido.cantidad)
-    
-    # Ordenar piezas de mayor a menor (Decreasing)
-    piezas.sort(reverse=True)
-    
-    # Lista de rollos utilizados
-    rollos: List[Rollo] = []
-    
-    # Colocar cada pieza en el primer rollo donde quepa
-    for pieza in piezas:
-        colocada = False
-        
-        # Intentar colocar en rollos existentes (First Fit)
-        for rollo in rollos:
-            if rollo.agregar_pieza(pieza):
-                colocada = True
-                break
-        
-        # Si no cabe en ningún rollo existente, crear uno nuevo
-        if not colocada:
-            nuevo_rollo = Rollo(longitud_rollo)
-            nuevo_rollo.agregar_pieza(pieza)
-            rollos.append(nuevo_rollo)
+    # Agrupar las piezas por largo, sin expandir los pedidos pieza a pieza
+    largos = np.fromiter((p.largo for p in pedidos), dtype=np.float64, count=len(pedidos))
+    cantidades = np.fromiter((p.cantidad for p in pedidos), dtype=np.int64, count=len(pedidos))
+    largos_mm = _cuantizar(largos, ESCALA_MM)
+    longitud_mm = _cuantizar(np.array([longitud_rollo]), ESCALA_MM)
+    
+    # Trabajar en milímetros enteros cuando los largos lo permiten; si algún
+    # largo no es entero en mm se trabaja con los largos flotantes.
+    if largos_mm is not None and longitud_mm is not None:
+        largos_nucleo = largos_mm
+        longitud_nucleo = longitud_mm[0]
+        escala = ESCALA_MM
+    else:
+        largos_nucleo = largos
+        longitud_nucleo = longitud_rollo
+        escala = 1
+    
+    # Largos distintos de mayor a menor (Decreasing) con su cantidad total.
+    # En milímetros los largos son claves enteras acotadas: basta un conteo
+    # por cubetas en vez de ordenar.
+    if escala == ESCALA_MM:
+        cubetas = np.bincount(largos_nucleo, weights=cantidades).astype(np.int64)
+        unicos = np.flatnonzero(cubetas)[::-1]
+        conteos = cubetas[unicos]
+    else:
+        unicos, inversa = np.unique(largos_nucleo, return_inverse=True)
+        conteos = np.bincount(inversa, weights=cantidades, minlength=len(unicos)).astype(np.int64)
+        unicos = unicos[::-1]
+        conteos = conteos[::-1]
+    unicos = np.ascontiguousarray(unicos)
+    conteos = np.ascontiguousarray(conteos)
+    
+    # Empaquetar con el núcleo compilado; con un solo largo la distribución
+    # se calcula directamente
+    if len(unicos) == 1:
+        seg_rollo, seg_largo, seg_cantidad, restantes = _ffd_un_largo(unicos[0], conteos[0], longitud_nucleo)
+    else:
+        seg_rollo, seg_largo, seg_cantidad, restantes = ffd_core(unicos, conteos, longitud_nucleo)
+    
+    # Reconstruir los objetos Rollo para la visualización: las colocaciones
+    # de cada rollo ya vienen de mayor a menor largo
+    orden = np.argsort(seg_rollo, kind='stable')
+    piezas_nucleo = np.repeat(unicos[seg_largo[orden]], seg_cantidad[orden])
+    piezas = piezas_nucleo / escala
+    piezas_por_rollo = np.bincount(seg_rollo, weights=seg_cantidad, minlength=len(restantes)).astype(np.int64)
+    limites = np.cumsum(piezas_por_rollo)
+    inicios = limites - piezas_por_rollo
+    
+    # Sumas acumuladas de todos los rollos en una pasada; en milímetros
+    # enteros son exactas
+    acumulado = np.cumsum(piezas_nucleo)
+    previo = np.concatenate(([0], acumulado))[inicios]
+    fines_piezas = (acumulado - np.repeat(previo, piezas_por_rollo)) / escala
+    
+    # Las piezas y posiciones de cada rollo son vistas de un solo arreglo
+    rollos = [Rollo(longitud_rollo) for _ in range(len(restantes))]
+    for rollo, inicio, fin in zip(rollos, inicios.tolist(), limites.tolist()):
+        rollo.piezas = piezas[inicio:fin]
+        rollo.fines = fines_piezas[inicio:fin]
+    
+    # Métricas de todos los rollos en una sola pasada vectorizada
+    usados = (longitud_nucleo - restantes) / escala
+    desperdicios = longitud_rollo - usados
+    eficiencias = usados / longitud_rollo * 100
+    for rollo, usado, desperdicio, eficiencia in zip(
+        rollos, usados.tolist(), desperdicios.tolist(), eficiencias.tolist()
+    ):
+        rollo.espacio_usado = usado
+        rollo.desperdicio = desperdicio
+        rollo.eficiencia = eficiencia
     
     return rollos
 
 
+def _rollo_desde_contenido(longitud_total: float, piezas: Tuple[float, ...],
+                           espacio_usado: float, fines: Tuple[float, ...]) -> Rollo:
+    """Reconstruye un Rollo a partir de su contenido inmutable."""
+    rollo = Rollo(longitud_total)
+    rollo.piezas = np.array(piezas, dtype=np.float64)
+    rollo.fines = np.array(fines, dtype=np.float64)
+    rollo.espacio_usado = espacio_usado
+    rollo.actualizar_metricas()
+    return rollo
+
+
+def _rollos_desde_contenido(contenido: Tuple[Tuple[Tuple[float, ...], float, Tuple[float, ...]], ...],
+                            longitud_total: float) -> List[Rollo]:
+    """Reconstruye la lista de rollos a partir de contenido_rollos."""
+    return [
+        _rollo_desde_contenido(longitud_total, piezas, espacio_usado, fines)
+        for piezas, espacio_usado, fines in contenido
+    ]
+
+
+def contenido_rollos(rollos: List[Rollo]) -> Tuple[Tuple[Tuple[float, ...], float, Tuple[float, ...]], ...]:
+    """Contenido inmutable de los rollos, usable como clave de caché."""
+    return tuple(
+        (tuple(rollo.piezas.tolist()), rollo.espacio_usado, tuple(rollo.fines.tolist()))
+        for rollo in rollos
+    )
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _ffd_cached(pedidos_tuple: Tuple[Tuple[float, int], ...],
+                longitud_rollo: float) -> Tuple[Tuple[Tuple[float, ...], float, Tuple[float, ...]], ...]:
+    """
+    Ejecuta first_fit_decreasing y devuelve el contenido de los rollos como
+    tuplas (piezas, espacio_usado, fines), cacheado entre ejecuciones del script.
+    """
+    pedidos = [Pedido(largo, cantidad) for largo, cantidad in pedidos_tuple]
+    rollos = first_fit_decreasing(pedidos, longitud_rollo)
+    return contenido_rollos(rollos)
+
+
+def first_fit_decreasing_cacheado(pedidos: List[Pedido], longitud_rollo: float) -> List[Rollo]:
+    """
+    Igual que first_fit_decreasing, pero reutiliza el resultado si los pedidos
+    y la longitud del rollo no cambiaron.
+    """
+    pedidos_tuple = tuple((p.largo, p.cantidad) for p in pedidos)
+    return _rollos_desde_contenido(_ffd_cached(pedidos_tuple, longitud_rollo), longitud_rollo)
+
+
+def calcular_estadisticas_rollos(rollos: List[Rollo]) -> Dict:
+    """
+    Calcula las métricas agregadas de un plan de corte.
+    
+    Se calculan una sola vez junto con los rollos, no en cada ejecución
+    del script.
+    """
+    eficiencias = np.fromiter((r.eficiencia for r in rollos), dtype=np.float64, count=len(rollos))
+    desperdicios = np.fromiter((r.desperdicio for r in rollos), dtype=np.float64, count=len(rollos))
+    usados = np.fromiter((r.espacio_usado for r in rollos), dtype=np.float64, count=len(rollos))
+    
+    return {
+        "total_rollos": len(rollos),
+        "desperdicio_total": float(desperdicios.sum()),
+        "eficiencia_promedio": float(eficiencias.mean()) if rollos else 0,
+        "metros_utilizados": float(usados.sum()),
+        "total_piezas": sum(len(r.piezas) for r in rollos),
+        "eficiencias": eficiencias,
+        "mejor_rollo": int(eficiencias.argmax()) if rollos else None,
+        "peor_rollo": int(eficiencias.argmin()) if rollos else None
+    }
+
+
 # ============================================================================
 # FUNCIONES PARA CÁLCULO DE FUENTES DE ENERGÍA
 # ============================================================================
 
+@st.cache_data(show_spinner=False)
+def _parsear_fuentes(texto: str) -> Tuple[float, ...]:
+    """
+    Convierte la lista de potencias separadas por comas en una tupla ordenada.
+    
+    Raises:
+        ValueError: Si alguna potencia no es un número
+    """
+    return tuple(sorted(float(w) for w in texto.split(',') if w.strip()))
+
+
 def obtener_fuente_adecuada_individual(consumo_requerido_watts: float, 
                                       fuentes_disponibles_watts: List[float], 
                                       factor_seguridad: float = 1.2) -> Tuple[float, str]:
@@ -357,7 +357,7 @@ def obtener_fuente_adecuada_individual(consumo_requerido_watts: float,
 def optimizar_fuentes_agrupadas(pedidos_list: List[Pedido], 
                                 watts_por_metro: float,
                                 fuentes_disponibles: List[float],
-                                factor_seguridad: float) -> Tuple[Dict, List, Dict]:
+                                factor_seguridad: float) -> Tuple[Dict, pd.DataFrame, Dict, np.ndarray]:
     """
     Optimiza la asignación de fuentes para agrupar cortes usando FFD mejorado.
     
@@ -365,7 +365,7 @@ def optimizar_fuentes_agrupadas(pedidos_list: List[Pedido],
     1. Expande todos los pedidos a piezas individuales
     2. Calcula consumo real y ajustado para cada pieza
     3. Ordena piezas por consumo descendente (FFD)
-    4. Asigna cada pieza a la primera fuente con capacidad suficiente
+    4. Asigna cada pieza a la primera fuente en uso con capacidad suficiente
     5. Si no cabe en ninguna fuente existente, abre una nueva fuente
     
     Args:
@@ -375,183 +375,277 @@ def optimizar_fuentes_agrupadas(pedidos_list: List[Pedido],
         factor_seguridad: Factor multiplicador de seguridad (ej: 1.2 para 20%)
     
     Returns:
-        Tuple[Dict, List, Dict]: (conteo_fuentes, detalles_asignacion, estadisticas)
+        Tuple[Dict, pd.DataFrame, Dict, np.ndarray]:
+            (conteo_fuentes, detalles_asignacion, estadisticas, porcentaje de uso por fuente)
     """
     # Crear diccionario de pedidos
-    pedidos_dict = {}
+    pedidos_dict = collections.Counter()
     for p in pedidos_list:
-        pedidos_dict[p.largo] = pedidos_dict.get(p.largo, 0) + p.cantidad
-    
-    # Expandir pedidos a piezas individuales con su consumo
-    piezas_consumo = []
-    for largo, cantidad in pedidos_dict.items():
-        consumo_real = largo * watts_por_metro
-        consumo_ajustado = consumo_real * factor_seguridad
-        for _ in range(cantidad):
-            piezas_consumo.append({
-                "largo": largo,
-                "consumo_real": consumo_real,
-                "consumo_ajustado": consumo_ajustado
-            })
-    
-    # Ordenar por consumo descendente (FFD)
-    piezas_consumo.sort(key=lambda x: x["consumo_ajustado"], reverse=True)
+        pedidos_dict[p.largo] += p.cantidad
+    
+    # Calcular consumo real y ajustado una sola vez por largo distinto
+    largos = np.fromiter(pedidos_dict.keys(), dtype=np.float64, count=len(pedidos_dict))
+    cantidades = np.fromiter(pedidos_dict.values(), dtype=np.int64, count=len(pedidos_dict))
+    consumos_reales = largos * watts_por_metro
+    consumos_ajustados = consumos_reales * factor_seguridad
+    
+    # Ordenar por consumo descendente (FFD), cuantizado a mW cuando es exacto
+    consumos_mw = _cuantizar(consumos_ajustados, ESCALA_MW)
+    if consumos_mw is not None:
+        orden = np.argsort(-consumos_mw, kind='stable')
+    else:
+        orden = np.argsort(-consumos_ajustados, kind='stable')
+    
+    # Expandir a piezas individuales ya ordenadas
+    cantidades = cantidades[orden]
+    piezas_largo = np.repeat(largos[orden], cantidades)
+    consumos_reales = np.repeat(consumos_reales[orden], cantidades)
+    consumos_ajustados = np.repeat(consumos_ajustados[orden], cantidades)
+    
+    # Asignar cada pieza a una fuente con el núcleo compilado. Las potencias
+    # se ordenan una sola vez para buscar la fuente adecuada por bisección.
+    # Con un solo largo todas las piezas van a la misma potencia y el
+    # reparto se calcula directamente.
+    fuentes_ordenadas = np.sort(np.asarray(fuentes_disponibles, dtype=np.float64))
+    if len(largos) == 1 and len(fuentes_ordenadas) > 0:
+        asignacion, tipos, restantes = _asignar_fuentes_un_consumo(
+            float(consumos_ajustados[0]), len(consumos_ajustados), fuentes_ordenadas
+        )
+    else:
+        asignacion, tipos, restantes = asignar_fuentes(
+            np.ascontiguousarray(consumos_ajustados), fuentes_ordenadas
+        )
+    potencias = fuentes_ordenadas[tipos]
     
-    # Fuentes en uso
-    fuentes_en_uso = []
     conteo_fuentes = collections.defaultdict(int)
+    for potencia in potencias.tolist():
+        conteo_fuentes[potencia] += 1
+    
+    # Piezas de cada fuente, en el orden en que fueron asignadas
+    orden_fuente = np.argsort(asignacion, kind='stable')
+    orden_fuente = orden_fuente[asignacion[orden_fuente] >= 0]
+    piezas_por_fuente = np.bincount(asignacion[orden_fuente], minlength=len(potencias))
+    fines = np.cumsum(piezas_por_fuente)
+    cortes = [
+        f"{largo:.2f}m ({consumo_real:.2f}W)"
+        for largo, consumo_real in zip(
+            piezas_largo[orden_fuente].tolist(), consumos_reales[orden_fuente].tolist()
+        )
+    ]
+    
+    # Consumo y porcentaje de uso de cada fuente
+    consumos_fuente = potencias - restantes
+    porcentajes_uso = np.divide(
+        consumos_fuente, potencias,
+        out=np.zeros_like(consumos_fuente), where=potencias > 0
+    ) * 100
+    disponibles = np.clip(restantes, 0, None)
+    
+    # Estado de cada fuente según su uso
+    condiciones = [restantes < 0, porcentajes_uso >= 90, porcentajes_uso >= 70]
+    estados = np.select(
+        condiciones, ["⚠️ SOBRECARGA", "🟡 Casi al límite", "🟢 Óptimo"], default="🔵 Subutilizada"
+    )
+    estados_color = np.select(
+        condiciones, ["#ef4444", "#f59e0b", "#10b981"], default="#3b82f6"
+    )
     
-    # Asignar cada pieza a una fuente
-    for pieza in piezas_consumo:
-        consumo = pieza["consumo_ajustado"]
-        asignada = False
-        
-        # Intentar en fuentes existentes
-        for fuente in fuentes_en_uso:
-            if fuente["restante"] >= consumo:
-                fuente["restante"] -= consumo
-                fuente["piezas"].append(pieza)
-                asignada = True
-                break
-        
-        # Si no cabe, crear nueva fuente
-        if not asignada:
-            fuente_encontrada = False
-            for fuente_w in sorted(fuentes_disponibles):
-                if fuente_w >= consumo:
-                    fuentes_en_uso.append({
-                        "potencia": fuente_w,
-                        "restante": fuente_w - consumo,
-                        "piezas": [pieza]
-                    })
-                    conteo_fuentes[fuente_w] += 1
-                    fuente_encontrada = True
-                    break
-            
-            if not fuente_encontrada:
-                # Asignar la fuente más grande aunque exceda
-                max_fuente = max(fuentes_disponibles) if fuentes_disponibles else None
-                if max_fuente:
-                    fuentes_en_uso.append({
-                        "potencia": max_fuente,
-                        "restante": max_fuente - consumo,
-                        "piezas": [pieza]
-                    })
-                    conteo_fuentes[max_fuente] += 1
-    
-    # Formatear detalles con información mejorada
-    detalles = []
-    total_consumo_real = 0
-    total_capacidad_desperdiciada = 0
-    fuentes_sobrecargadas = 0
-    
-    for idx, fuente in enumerate(fuentes_en_uso, 1):
-        piezas_info = []
-        for p in fuente["piezas"]:
-            piezas_info.append(f"{p['largo']:.2f}m ({p['consumo_real']:.2f}W)")
-        
-        piezas_str = ", ".join(piezas_info)
-        num_piezas = len(fuente["piezas"])
-        consumo_total = fuente["potencia"] - fuente["restante"]
-        porcentaje_uso = (consumo_total / fuente["potencia"]) * 100 if fuente["potencia"] > 0 else 0
-        
-        total_consumo_real += consumo_total
-        total_capacidad_desperdiciada += max(0, fuente["restante"])
-        
-        if fuente["restante"] < 0:
-            fuentes_sobrecargadas += 1
-            estado = "⚠️ SOBRECARGA"
-            estado_color = "#ef4444"
-        elif porcentaje_uso >= 90:
-            estado = "🟡 Casi al límite"
-            estado_color = "#f59e0b"
-        elif porcentaje_uso >= 70:
-            estado = "🟢 Óptimo"
-            estado_color = "#10b981"
-        else:
-            estado = "🔵 Subutilizada"
-            estado_color = "#3b82f6"
-        
-        detalles.append({
-            "ID": f"F-{idx}",
-            "Potencia (W)": f"{fuente['potencia']:.0f}",
-            "N° Piezas": num_piezas,
-            "Cortes Asignados": piezas_str,
-            "Consumo (W)": f"{consumo_total:.2f}",
-            "Uso (%)": f"{porcentaje_uso:.1f}%",
-            "Disponible (W)": f"{max(0, fuente['restante']):.2f}",
-            "Estado": estado,
-            "_color": estado_color
-        })
-    
-    # Calcular estadísticas generales
-    total_fuentes = len(fuentes_en_uso)
+    # Formatear detalles con información mejorada, columna por columna
+    detalles = pd.DataFrame({
+        "ID": [f"F-{idx}" for idx in range(1, len(potencias) + 1)],
+        "Potencia (W)": pd.Series(potencias, dtype=np.float64).map("{:.0f}".format),
+        "N° Piezas": piezas_por_fuente,
+        "Cortes Asignados": [
+            ", ".join(cortes[fin - num_piezas:fin])
+            for num_piezas, fin in zip(piezas_por_fuente.tolist(), fines.tolist())
+        ],
+        "Consumo (W)": pd.Series(consumos_fuente, dtype=np.float64).map("{:.2f}".format),
+        "Uso (%)": pd.Series(porcentajes_uso, dtype=np.float64).map("{:.1f}%".format),
+        "Disponible (W)": pd.Series(disponibles, dtype=np.float64).map("{:.2f}".format),
+        "Estado": estados,
+        "_color": estados_color
+    })
+    
+    # Calcular estadísticas generales con reducciones de NumPy
+    total_fuentes = len(potencias)
+    total_consumo_real = float(consumos_fuente.sum())
+    total_capacidad_instalada = float(potencias.sum())
     eficiencia_promedio = 0
     if total_fuentes > 0:
-        eficiencia_promedio = (total_consumo_real / sum(f["potencia"] for f in fuentes_en_uso)) * 100
+        eficiencia_promedio = (total_consumo_real / total_capacidad_instalada) * 100
     
     estadisticas = {
         "total_fuentes": total_fuentes,
         "total_consumo_real": total_consumo_real,
-        "total_capacidad_instalada": sum(f["potencia"] for f in fuentes_en_uso),
-        "capacidad_desperdiciada": total_capacidad_desperdiciada,
+        "total_capacidad_instalada": total_capacidad_instalada,
+        "capacidad_desperdiciada": float(disponibles.sum()),
         "eficiencia_promedio": eficiencia_promedio,
-        "fuentes_sobrecargadas": fuentes_sobrecargadas,
-        "total_piezas": len(piezas_consumo)
+        "fuentes_sobrecargadas": int((restantes < 0).sum()),
+        "total_piezas": len(piezas_largo)
     }
     
-    return conteo_fuentes, detalles, estadisticas
+    return conteo_fuentes, detalles, estadisticas, porcentajes_uso
+
+
+def calcular_fuentes_individual(pedidos_list: List[Pedido],
+                                watts_por_metro: float,
+                                fuentes_disponibles: List[float],
+                                factor_seguridad: float) -> Tuple[Dict, List]:
+    """
+    Asigna una fuente a cada corte (modo individual).
+    
+    Returns:
+        Tuple[Dict, List]: (conteo_fuentes, detalles_asignacion)
+    """
+    # Crear diccionario de pedidos para cálculo de fuentes
+    pedidos_dict = collections.Counter()
+    for p in pedidos_list:
+        pedidos_dict[p.largo] += p.cantidad
+    
+    conteo_fuentes = collections.defaultdict(int)
+    detalles = []
+    
+    for largo, cant in pedidos_dict.items():
+        consumo = largo * watts_por_metro
+        fuente, advertencia = obtener_fuente_adecuada_individual(
+            consumo, fuentes_disponibles, factor_seguridad
+        )
+        
+        if fuente:
+            conteo_fuentes[fuente] += cant
+            detalles.append({
+                "Largo (m)": f"{largo:.2f}",
+                "Cantidad": cant,
+                "Consumo por Pieza (W)": f"{consumo:.2f}",
+                "Consumo Ajustado (W)": f"{consumo * factor_seguridad:.2f}",
+                "Fuente Asignada (W)": f"{fuente:.0f}",
+                "Estado": advertencia if advertencia else "✅ OK"
+            })
+    
+    return conteo_fuentes, detalles
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _fuentes_cached(pedidos_tuple: Tuple[Tuple[float, int], ...],
+                    watts_por_metro: float,
+                    fuentes_tuple: Tuple[float, ...],
+                    factor_seguridad: float,
+                    modo: str) -> Dict:
+    """
+    Calcula los resultados de fuentes en el modo indicado, cacheado entre
+    ejecuciones del script para los mismos pedidos y parámetros.
+    """
+    pedidos = [Pedido(largo, cantidad) for largo, cantidad in pedidos_tuple]
+    fuentes_disponibles = list(fuentes_tuple)
+    
+    if modo == "Una fuente por corte":
+        conteo, detalles = calcular_fuentes_individual(
+            pedidos, watts_por_metro, fuentes_disponibles, factor_seguridad
+        )
+        return {
+            "modo": "individual",
+            "conteo": conteo,
+            "detalles": detalles
+        }
+    
+    # Modo optimizado con estadísticas mejoradas
+    conteo, detalles, estadisticas, usos = optimizar_fuentes_agrupadas(
+        pedidos, watts_por_metro, fuentes_disponibles, factor_seguridad
+    )
+    return {
+        "modo": "optimizado",
+        "conteo": conteo,
+        "detalles": detalles,
+        "estadisticas": estadisticas,
+        "usos_numeric": usos
+    }
 
 
 # ============================================================================
 # FUNCIONES DE VISUALIZACIÓN
 # ============================================================================
 
-def crear_visualizacion_rollo(rollo: Rollo, numero_rollo: int) -> go.Figure:
+# Colores para las piezas
+COLORES_PIEZAS = ['#f97316', '#10b981', '#3b82f6', '#8b5cf6', '#ec4899', '#f59e0b']
+
+# Altura en píxeles de cada rollo dentro de la figura de distribución
+ALTURA_FILA_ROLLO = 50
+
+# Layout común de la figura de rollos (la altura y el rango del eje X
+# se agregan según los rollos)
+LAYOUT_ROLLO = dict(
+    barmode='stack',
+    showlegend=False,
+    margin=dict(l=10, r=10, t=10, b=10),
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    xaxis=dict(
+        showgrid=True,
+        gridcolor='#e5e7eb',
+        zeroline=False,
+        title=dict(text='Longitud (m)', font=dict(size=11, color='#64748b')),
+        tickfont=dict(family='JetBrains Mono', size=10, color='#64748b')
+    ),
+    yaxis=dict(
+        showgrid=False,
+        autorange='reversed',
+        tickfont=dict(family='JetBrains Mono', size=10, color='#64748b')
+    ),
+    hovermode='closest',
+    font=dict(family='Work Sans')
+)
+
+
+def crear_visualizacion_rollos(rollos: List[Rollo]) -> go.Figure:
     """
-    Crea una visualización horizontal de un rollo con sus cortes.
+    Crea una visualización horizontal de todos los rollos con sus cortes.
+    
+    Cada rollo es una fila de la misma figura: todas las piezas van en una
+    traza y todos los desperdicios en otra, así se envía un solo gráfico.
     
     Args:
-        rollo: Objeto Rollo a visualizar
-        numero_rollo: Número identificador del rollo
+        rollos: Lista de rollos a visualizar
     
     Returns:
         Figura de Plotly
     """
     fig = go.Figure()
     
-    # Colores para las piezas
-    colores = ['#f97316', '#10b981', '#3b82f6', '#8b5cf6', '#ec4899', '#f59e0b']
-    
-    posicion_actual = 0
-    
-    # Agregar cada pieza como un segmento
-    for idx, pieza in enumerate(rollo.piezas):
-        color = colores[idx % len(colores)]
-        
-        fig.add_trace(go.Bar(
-            y=[f'Rollo {numero_rollo}'],
-            x=[pieza],
-            orientation='h',
-            name=f'{pieza}m',
-            marker=dict(
-                color=color,
-                line=dict(color='white', width=2)
-            ),
-            text=f'{pieza}m',
-            textposition='inside',
-            textfont=dict(color='white', size=12, family='JetBrains Mono'),
-            hovertemplate=f'<b>Pieza:</b> {pieza}m<br><extra></extra>',
-            base=posicion_actual
-        ))
-        
-        posicion_actual += pieza
-    
-    # Agregar desperdicio si existe
-    if rollo.desperdicio > 0:
+    if not rollos:
+        fig.update_layout(**LAYOUT_ROLLO)
+        return fig
+    
+    filas = [f'Rollo {idx}' for idx in range(1, len(rollos) + 1)]
+    piezas_por_rollo = np.fromiter((len(rollo.piezas) for rollo in rollos), dtype=np.int64, count=len(rollos))
+    
+    # Posición de cada pieza dentro de su rollo
+    largos = np.concatenate([rollo.piezas for rollo in rollos])
+    bases = np.concatenate([np.concatenate(([0.0], rollo.fines[:-1])) for rollo in rollos])
+    primeras = np.repeat(np.cumsum(piezas_por_rollo) - piezas_por_rollo, piezas_por_rollo)
+    numeros_pieza = np.arange(len(largos)) - primeras
+    
+    fig.add_trace(go.Bar(
+        y=np.repeat(filas, piezas_por_rollo),
+        x=largos,
+        orientation='h',
+        name='Piezas',
+        marker=dict(
+            color=[COLORES_PIEZAS[idx % len(COLORES_PIEZAS)] for idx in numeros_pieza.tolist()],
+            line=dict(color='white', width=2)
+        ),
+        text=[f'{pieza}m' for pieza in largos.tolist()],
+        textposition='inside',
+        textfont=dict(color='white', size=12, family='JetBrains Mono'),
+        hovertemplate='<b>Pieza:</b> %{text}<br><extra></extra>',
+        base=bases
+    ))
+    
+    # Agregar el desperdicio de los rollos que lo tienen
+    con_desperdicio = [idx for idx, rollo in enumerate(rollos) if rollo.desperdicio > 0]
+    if con_desperdicio:
         fig.add_trace(go.Bar(
-            y=[f'Rollo {numero_rollo}'],
-            x=[rollo.desperdicio],
+            y=[filas[idx] for idx in con_desperdicio],
+            x=[rollos[idx].desperdicio for idx in con_desperdicio],
             orientation='h',
             name='Desperdicio',
             marker=dict(
@@ -559,56 +653,488 @@ def crear_visualizacion_rollo(rollo: Rollo, numero_rollo: int) -> go.Figure:
                 pattern=dict(shape='/', fgcolor='#9ca3af', size=8, solidity=0.3),
                 line=dict(color='#6b7280', width=2)
             ),
-            text=f'{rollo.desperdicio:.2f}m',
+            text=[f'{rollos[idx].desperdicio:.2f}m' for idx in con_desperdicio],
             textposition='inside',
             textfont=dict(color='#4b5563', size=11, family='JetBrains Mono'),
-            hovertemplate=f'<b>Desperdicio:</b> {rollo.desperdicio:.2f}m<br><extra></extra>',
-            base=posicion_actual
+            hovertemplate='<b>Desperdicio:</b> %{text}<br><extra></extra>',
+            base=[float(rollos[idx].fines[-1]) for idx in con_desperdicio]
         ))
     
-    # Configuración del layout
+    # Configuración del layout: plantilla común más el rango y la altura
     fig.update_layout(
-        barmode='stack',
-        showlegend=False,
-        height=100,
-        margin=dict(l=10, r=10, t=10, b=10),
+        **LAYOUT_ROLLO,
+        height=ALTURA_FILA_ROLLO * len(rollos) + 60,
+        xaxis_range=[0, rollos[0].longitud_total]
+    )
+    
+    return fig
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _visualizacion_rollos_cacheada(contenido: Tuple[Tuple[Tuple[float, ...], float, Tuple[float, ...]], ...],
+                                   longitud_total: float) -> go.Figure:
+    """Versión cacheada de crear_visualizacion_rollos, por contenido de los rollos."""
+    return crear_visualizacion_rollos(_rollos_desde_contenido(contenido, longitud_total))
+
+
+def crear_grafico_eficiencia(eficiencias: np.ndarray) -> go.Figure:
+    """Crea el gráfico de barras con la eficiencia de cada rollo."""
+    fig_eficiencia = go.Figure()
+    
+    fig_eficiencia.add_trace(go.Bar(
+        x=[f"Rollo {i+1}" for i in range(len(eficiencias))],
+        y=eficiencias,
+        marker=dict(
+            color=eficiencias,
+            colorscale=[[0, '#ef4444'], [0.5, '#f59e0b'], [1, '#10b981']],
+            showscale=False,
+            line=dict(color='white', width=2)
+        ),
+        text=[f"{e:.1f}%" for e in eficiencias],
+        textposition='outside',
+        textfont=dict(family='JetBrains Mono', size=12, color='#0f172a'),
+        hovertemplate='<b>%{x}</b><br>Eficiencia: %{y:.1f}%<extra></extra>'
+    ))
+    
+    fig_eficiencia.update_layout(
+        title="Eficiencia por Rollo",
+        xaxis_title="Rollo",
+        yaxis_title="Eficiencia (%)",
+        height=300,
         plot_bgcolor='rgba(0,0,0,0)',
         paper_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(
-            range=[0, rollo.longitud_total],
-            showgrid=True,
-            gridcolor='#e5e7eb',
-            zeroline=False,
-            title=dict(text='Longitud (m)', font=dict(size=11, color='#64748b')),
-            tickfont=dict(family='JetBrains Mono', size=10, color='#64748b')
-        ),
-        yaxis=dict(
-            showticklabels=False,
-            showgrid=False
-        ),
-        hovermode='closest',
-        font=dict(family='Work Sans')
+        font=dict(family='Work Sans', color='#0f172a'),
+        title_font=dict(size=16, color='#0f172a'),
+        yaxis=dict(range=[0, 100], showgrid=True, gridcolor='#e5e7eb'),
+        xaxis=dict(showgrid=False),
+        margin=dict(l=40, r=40, t=60, b=40)
     )
     
-    return fig
+    return fig_eficiencia
+
+
+def mostrar_resumen_rollo(rollo: Rollo, numero_rollo: int):
+    """Muestra el resumen detallado de un rollo."""
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    with col1:
+        st.markdown(f"**Rollo #{numero_rollo}**")
+        detalles = ", ".join([f"{p}m" for p in rollo.piezas.tolist()])
+        st.caption(f"Piezas: {detalles}")
+    
+    with col2:
+        eficiencia_color = "🟢" if rollo.eficiencia >= 80 else "🟡" if rollo.eficiencia >= 60 else "🔴"
+        st.metric("Eficiencia", f"{rollo.eficiencia:.1f}%", delta=f"{eficiencia_color}")
+    
+    with col3:
+        st.metric("Desperdicio", f"{rollo.desperdicio:.2f}m")
+
+
+# ============================================================================
+# FUNCIONES DE EXPORTACIÓN
+# ============================================================================
+
+def crear_tabla_cortes(rollos: List[Rollo]) -> pd.DataFrame:
+    """
+    Construye la tabla de detalle de cortes, con una fila por pieza.
+    
+    Las posiciones salen de las sumas acumuladas guardadas en cada rollo.
+    """
+    piezas_por_rollo = np.fromiter((len(rollo.piezas) for rollo in rollos), dtype=np.int64, count=len(rollos))
+    total_piezas = int(piezas_por_rollo.sum())
+    
+    if total_piezas == 0:
+        return pd.DataFrame(columns=["Rollo", "Pieza", "Largo (m)", "Posición"])
+    
+    fines = np.concatenate([rollo.fines for rollo in rollos])
+    inicios = np.concatenate([np.concatenate(([0.0], rollo.fines[:-1])) for rollo in rollos])
+    primeras = np.repeat(np.cumsum(piezas_por_rollo) - piezas_por_rollo, piezas_por_rollo)
+    
+    return pd.DataFrame({
+        "Rollo": np.repeat([f"#{idx}" for idx in range(1, len(rollos) + 1)], piezas_por_rollo),
+        "Pieza": np.arange(total_piezas, dtype=np.int64) - primeras + 1,
+        "Largo (m)": np.concatenate([rollo.piezas for rollo in rollos]),
+        "Posición": [
+            f"{inicio:.2f}m - {fin:.2f}m"
+            for inicio, fin in zip(inicios.tolist(), fines.tolist())
+        ]
+    })
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _csv_cortes(contenido: Tuple[Tuple[Tuple[float, ...], float, Tuple[float, ...]], ...],
+                longitud_total: float) -> bytes:
+    """CSV del plan de corte, cacheado por el contenido de los rollos."""
+    rollos = _rollos_desde_contenido(contenido, longitud_total)
+    return crear_tabla_cortes(rollos).to_csv(index=False).encode('utf-8')
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _tabla_cortes_arrow(contenido: Tuple[Tuple[Tuple[float, ...], float, Tuple[float, ...]], ...],
+                        longitud_total: float) -> pa.Table:
+    """
+    Tabla de detalle de cortes ya convertida a Arrow, cacheada por el
+    contenido de los rollos; st.dataframe la envía sin volver a convertirla.
+    """
+    rollos = _rollos_desde_contenido(contenido, longitud_total)
+    return pa.Table.from_pandas(crear_tabla_cortes(rollos), preserve_index=False)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _csv_fuentes(df_fuentes: pd.DataFrame) -> bytes:
+    """CSV del plan de fuentes, cacheado por el contenido de la tabla."""
+    return df_fuentes.to_csv(index=False).encode('utf-8')
+
+
+# ============================================================================
+# FUNCIONES DE RESULTADOS
+# ============================================================================
+
+def artefactos_resultados() -> Dict:
+    """
+    Devuelve las figuras y tablas del plan de corte actual.
+    
+    Se construyen una vez por versión de los resultados y se guardan en la
+    sesión; las demás ejecuciones del script solo las leen.
+    """
+    cache = st.session_state.cache_resultados
+    version = st.session_state.resultados_version
+    
+    if cache.get("version") != version:
+        rollos = st.session_state.resultados
+        contenido = contenido_rollos(rollos)
+        longitud_total = rollos[0].longitud_total
+        cache = {
+            "version": version,
+            "fig_rollos": _visualizacion_rollos_cacheada(contenido, longitud_total),
+            "tabla_cortes": _tabla_cortes_arrow(contenido, longitud_total),
+            "csv_cortes": _csv_cortes(contenido, longitud_total),
+            "fig_eficiencia": crear_grafico_eficiencia(st.session_state.resultados_stats["eficiencias"])
+        }
+        st.session_state.cache_resultados = cache
+    
+    return cache
+
+
+@st.fragment
+def mostrar_resultados_rollos():
+    """
+    Muestra los resultados del plan de corte guardados en la sesión.
+    
+    Es un fragmento: los widgets de esta sección solo vuelven a ejecutar
+    esta función, no el script completo.
+    """
+    # Mostrar resultados de optimización
+    rollos = st.session_state.resultados
+    artefactos = artefactos_resultados()
+    
+    # Métricas totales, calculadas junto con los rollos
+    stats_rollos = st.session_state.resultados_stats
+    total_rollos = stats_rollos["total_rollos"]
+    desperdicio_total = stats_rollos["desperdicio_total"]
+    eficiencia_promedio = stats_rollos["eficiencia_promedio"]
+    metros_utilizados = stats_rollos["metros_utilizados"]
+    
+    # Métricas principales
+    st.markdown("## 📊 Resultados de Optimización")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(
+            label="Rollos Utilizados",
+            value=total_rollos,
+            delta="Optimizado" if total_rollos > 0 else None
+        )
+    
+    with col2:
+        st.metric(
+            label="Desperdicio Total",
+            value=f"{desperdicio_total:.2f}m",
+            delta=f"{(desperdicio_total/metros_utilizados*100):.1f}%" if metros_utilizados > 0 else "0%",
+            delta_color="inverse"
+        )
+    
+    with col3:
+        st.metric(
+            label="Eficiencia Promedio",
+            value=f"{eficiencia_promedio:.1f}%",
+            delta="Excelente" if eficiencia_promedio >= 80 else "Bueno" if eficiencia_promedio >= 60 else "Regular"
+        )
+    
+    with col4:
+        st.metric(
+            label="Material Usado",
+            value=f"{metros_utilizados:.2f}m",
+            delta=f"{len(st.session_state.pedidos)} cortes"
+        )
+    
+    st.markdown('<div class="custom-divider"></div>', unsafe_allow_html=True)
+    
+    # Visualización detallada por rollo
+    st.markdown("## 🎨 Distribución de Cortes")
+    
+    # Visualización gráfica de todos los rollos en una sola figura
+    st.plotly_chart(artefactos["fig_rollos"], use_container_width=True, config={'displayModeBar': False})
+    
+    # Resumen de cada rollo en una tarjeta nativa
+    for idx, rollo in enumerate(rollos, 1):
+        with st.container(border=True):
+            mostrar_resumen_rollo(rollo, idx)
+    
+    # Tabla detallada de cortes
+    st.markdown("---")
+    st.markdown("## 📋 Detalle Completo de Cortes")
+    
+    # Crear tabla con todos los cortes
+    tabla_cortes = artefactos["tabla_cortes"]
+    
+    if tabla_cortes.num_rows > 0:
+        st.dataframe(
+            tabla_cortes,
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        # Botón de descarga
+        st.download_button(
+            label="⬇️ Descargar Plan de Corte (CSV)",
+            data=artefactos["csv_cortes"],
+            file_name="plan_de_corte.csv",
+            mime="text/csv",
+            use_container_width=False
+        )
+    
+    # Análisis adicional
+    st.markdown("---")
+    st.markdown("## 📈 Análisis de Eficiencia")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Gráfico de eficiencia por rollo
+        st.plotly_chart(artefactos["fig_eficiencia"], use_container_width=True, config={'displayModeBar': False})
+    
+    with col2:
+        # Estadísticas resumen
+        st.markdown("### 📊 Estadísticas")
+        
+        eficiencias = stats_rollos["eficiencias"]
+        mejor_rollo = stats_rollos["mejor_rollo"]
+        peor_rollo = stats_rollos["peor_rollo"]
+        
+        st.markdown(f"""
+        - **Mejor rollo:** {mejor_rollo + 1} ({eficiencias[mejor_rollo]:.1f}% eficiencia)
+        - **Peor rollo:** {peor_rollo + 1} ({eficiencias[peor_rollo]:.1f}% eficiencia)
+        - **Desperdicio promedio:** {desperdicio_total/total_rollos:.2f}m por rollo
+        - **Total de piezas:** {stats_rollos['total_piezas']} cortadas
+        """)
+        
+        # Indicador de calidad
+        if eficiencia_promedio >= 85:
+            st.success("✅ Excelente optimización - Desperdicio mínimo")
+        elif eficiencia_promedio >= 70:
+            st.info("ℹ️ Buena optimización - Desperdicio aceptable")
+        else:
+            st.warning("⚠️ Optimización mejorable - Considere ajustar los cortes")
 
 
-def mostrar_resumen_rollo(rollo: Rollo, numero_rollo: int):
-    """Muestra el resumen detallado de un rollo."""
+@st.fragment
+def mostrar_resultados_fuentes():
+    """Muestra los resultados de fuentes guardados en la sesión (fragmento)."""
+    st.markdown("---")
+    st.markdown("## ⚡ Resultados de Fuentes")
     
-    col1, col2, col3 = st.columns([2, 1, 1])
+    res_fuentes = st.session_state.resultados_fuentes
+    
+    # Resumen de fuentes necesarias
+    st.markdown("### 📊 Resumen de Fuentes Necesarias")
+    
+    col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown(f"**Rollo #{numero_rollo}**")
-        detalles = ", ".join([f"{p}m" for p in rollo.piezas])
-        st.caption(f"Piezas: {detalles}")
+        total_fuentes_count = sum(res_fuentes["conteo"].values())
+        st.metric("Total de Fuentes Requeridas", total_fuentes_count)
+        
+        st.markdown("**Desglose por potencia:**")
+        for potencia, cantidad in sorted(res_fuentes["conteo"].items()):
+            st.write(f"- **{potencia:.0f}W**: {cantidad} unidades")
     
     with col2:
-        eficiencia_color = "🟢" if rollo.eficiencia >= 80 else "🟡" if rollo.eficiencia >= 60 else "🔴"
-        st.metric("Eficiencia", f"{rollo.eficiencia:.1f}%", delta=f"{eficiencia_color}")
+        if res_fuentes["modo"] == "individual":
+            st.info("**Modo de asignación:** Una fuente por cada corte")
+            st.markdown("""
+            Cada corte tiene su propia fuente, 
+            asegurando máxima independencia y flexibilidad.
+            """)
+        else:
+            st.success("**Modo de asignación:** Fuentes optimizadas (agrupadas)")
+            st.markdown("""
+            Múltiples cortes agrupados en cada fuente mediante 
+            algoritmo FFD, minimizando el número total de fuentes.
+            """)
+            
+            # Mostrar estadísticas mejoradas solo en modo optimizado
+            if "estadisticas" in res_fuentes:
+                stats = res_fuentes["estadisticas"]
+                
+                st.markdown("---")
+                st.markdown("**Estadísticas de Eficiencia:**")
+                st.metric(
+                    "Eficiencia Promedio", 
+                    f"{stats['eficiencia_promedio']:.1f}%",
+                    help="Porcentaje de capacidad utilizada vs capacidad total instalada"
+                )
+                
+                if stats["fuentes_sobrecargadas"] > 0:
+                    st.warning(f"⚠️ {stats['fuentes_sobrecargadas']} fuente(s) sobrecargada(s)")
+                else:
+                    st.success("✅ Todas las fuentes dentro de capacidad")
     
-    with col3:
-        st.metric("Desperdicio", f"{rollo.desperdicio:.2f}m")
+    # Métricas adicionales en modo optimizado
+    if res_fuentes["modo"] == "optimizado" and "estadisticas" in res_fuentes:
+        st.markdown("---")
+        st.markdown("### 📊 Métricas Detalladas de Fuentes")
+        
+        stats = res_fuentes["estadisticas"]
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(
+                "Consumo Total Real",
+                f"{stats['total_consumo_real']:.1f}W",
+                help="Suma del consumo de todas las piezas"
+            )
+        
+        with col2:
+            st.metric(
+                "Capacidad Instalada",
+                f"{stats['total_capacidad_instalada']:.1f}W",
+                help="Suma de potencia de todas las fuentes asignadas"
+            )
+        
+        with col3:
+            st.metric(
+                "Capacidad Disponible",
+                f"{stats['capacidad_desperdiciada']:.1f}W",
+                delta=f"{(stats['capacidad_desperdiciada']/stats['total_capacidad_instalada']*100):.1f}% spare",
+                help="Capacidad no utilizada en las fuentes"
+            )
+        
+        with col4:
+            st.metric(
+                "Total de Piezas",
+                stats['total_piezas'],
+                help="Número total de cortes a alimentar"
+            )
+        
+        # Gráfico de distribución de uso de fuentes
+        if len(res_fuentes["detalles"]) > 0:
+            st.markdown("---")
+            st.markdown("### 📈 Distribución de Uso de Fuentes")
+            
+            # Porcentajes de uso calculados junto con la asignación
+            usos = res_fuentes["usos_numeric"]
+            labels = res_fuentes["detalles"]["ID"]
+            
+            # Color según el estado: amarillo casi al límite, verde óptimo,
+            # azul subutilizada
+            colors = np.where(usos >= 90, '#f59e0b', np.where(usos >= 70, '#10b981', '#3b82f6'))
+            
+            fig_uso = go.Figure()
+            
+            fig_uso.add_trace(go.Bar(
+                x=labels,
+                y=usos,
+                marker=dict(
+                    color=colors.tolist(),
+                    line=dict(color='white', width=2)
+                ),
+                text=[f"{u:.1f}%" for u in usos.tolist()],
+                textposition='outside',
+                textfont=dict(family='JetBrains Mono', size=11, color='#0f172a'),
+                hovertemplate='<b>%{x}</b><br>Uso: %{y:.1f}%<br><extra></extra>'
+            ))
+            
+            # Líneas de referencia
+            fig_uso.add_hline(
+                y=90, line_dash="dash", line_color="#ef4444", 
+                annotation_text="Límite recomendado (90%)",
+                annotation_position="right"
+            )
+            fig_uso.add_hline(
+                y=70, line_dash="dot", line_color="#10b981",
+                annotation_text="Uso óptimo (70%)",
+                annotation_position="right"
+            )
+            
+            fig_uso.update_layout(
+                title="Porcentaje de Uso por Fuente",
+                xaxis_title="Fuente",
+                yaxis_title="Uso (%)",
+                height=350,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(family='Work Sans', color='#0f172a'),
+                title_font=dict(size=16, color='#0f172a'),
+                yaxis=dict(range=[0, 110], showgrid=True, gridcolor='#e5e7eb'),
+                xaxis=dict(showgrid=False),
+                margin=dict(l=40, r=40, t=80, b=40)
+            )
+            
+            st.plotly_chart(fig_uso, use_container_width=True, config={'displayModeBar': False})
+            
+            # Interpretación de resultados
+            promedio_uso = float(usos.mean()) if len(usos) else 0
+            
+            if promedio_uso >= 85:
+                st.success("✅ **Excelente optimización:** Las fuentes están bien aprovechadas sin estar sobrecargadas.")
+            elif promedio_uso >= 65:
+                st.info("ℹ️ **Buena optimización:** Uso equilibrado de las fuentes con margen de seguridad.")
+            else:
+                st.warning("⚠️ **Optimización mejorable:** Las fuentes están subutilizadas. Considera usar fuentes de menor potencia.")
+    
+    # Detalle de asignación
+    if len(res_fuentes["detalles"]) > 0:
+        st.markdown("---")
+        st.markdown("### 📋 Detalle de Asignación de Fuentes")
+        
+        df_fuentes = pd.DataFrame(res_fuentes["detalles"])
+        
+        # Remover la columna interna de color si existe
+        if "_color" in df_fuentes.columns:
+            df_fuentes = df_fuentes.drop(columns=["_color"])
+        
+        st.dataframe(df_fuentes, use_container_width=True, hide_index=True)
+        
+        # Botón de descarga
+        csv_fuentes = _csv_fuentes(df_fuentes)
+        st.download_button(
+            label="⬇️ Descargar Plan de Fuentes (CSV)",
+            data=csv_fuentes,
+            file_name="plan_de_fuentes.csv",
+            mime="text/csv",
+            use_container_width=False
+        )
+        
+        # Notas importantes
+        st.info("""
+        💡 **Nota importante:** Cada modelo de fuente de poder tiene un máximo de 
+        tiras o metros que puede alimentar según su ficha técnica. Verifica estas 
+        especificaciones antes de la instalación final.
+        """)
+
+
+@st.cache_resource
+def cargar_logo() -> Optional[Image.Image]:
+    """Carga y decodifica el logo una sola vez; None si el archivo no existe."""
+    if os.path.exists("logo.png"):
+        logo = Image.open("logo.png")
+        logo.load()
+        return logo
+    return None
 
 
 # ============================================================================
@@ -642,8 +1168,8 @@ def check_authentication():
     
     # Intentar cargar el logo
     try:
-        if os.path.exists("logo.png"):
-            logo = Image.open("logo.png")
+        logo = cargar_logo()
+        if logo:
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 st.image(logo, use_container_width=True)
@@ -668,22 +1194,29 @@ def check_authentication():
             if email_input:
                 email_normalizado = email_input.strip().lower()
                 
-                # Cargar emails autorizados desde Streamlit Secrets
-                try:
-                    # Intentar cargar desde secrets (para producción)
-                    emails_str = st.secrets.get("emails_autorizados", "")
-                    EMAILS_AUTORIZADOS = [email.strip().lower() for email in emails_str.split(',') if email.strip()]
-                except:
-                    # Si no hay secrets configurados, usar lista por defecto (desarrollo)
-                    EMAILS_AUTORIZADOS = [
-                        "admin@jenny.com",
-                        "gerencia@jenny.com",
-                        "produccion@jenny.com",
-                        "ejemplo@gmail.com"
-                    ]
+                # Cargar emails autorizados desde Streamlit Secrets (una vez por sesión)
+                if 'authorized_emails' not in st.session_state:
+                    try:
+                        # Intentar cargar desde secrets (para producción)
+                        emails_str = st.secrets.get("emails_autorizados", "")
+                        st.session_state.authorized_emails = frozenset(
+                            email.strip().lower() for email in emails_str.split(',') if email.strip()
+                        )
+                        st.session_state.using_test_emails = False
+                    except:
+                        # Si no hay secrets configurados, usar lista por defecto (desarrollo)
+                        st.session_state.authorized_emails = frozenset({
+                            "admin@jenny.com",
+                            "gerencia@jenny.com",
+                            "produccion@jenny.com",
+                            "ejemplo@gmail.com"
+                        })
+                        st.session_state.using_test_emails = True
+                
+                if st.session_state.using_test_emails:
                     st.warning("⚠️ Usando emails de prueba. Configura secrets en producción.")
                 
-                if email_normalizado in EMAILS_AUTORIZADOS:
+                if email_normalizado in st.session_state.authorized_emails:
                     st.session_state.authenticated = True
                     st.session_state.user_email = email_normalizado
                     st.success(f"✅ ¡Bienvenido! Acceso concedido para {email_normalizado}")
@@ -717,12 +1250,30 @@ if 'pedidos' not in st.session_state:
 if 'resultados' not in st.session_state:
     st.session_state.resultados = None
 
+if 'resultados_stats' not in st.session_state:
+    st.session_state.resultados_stats = None
+
+# Versión de los resultados y artefactos de render construidos para ella
+if 'resultados_version' not in st.session_state:
+    st.session_state.resultados_version = 0
+
+if 'cache_resultados' not in st.session_state:
+    st.session_state.cache_resultados = {}
+
 if 'resultados_fuentes' not in st.session_state:
     st.session_state.resultados_fuentes = None
 
 if 'calcular_fuentes_enabled' not in st.session_state:
     st.session_state.calcular_fuentes_enabled = False
 
+
+def limpiar_pedidos():
+    """Vacía la lista de pedidos y los resultados (callback del botón Limpiar)."""
+    st.session_state.pedidos = []
+    st.session_state.resultados = None
+    st.session_state.resultados_stats = None
+    st.session_state.resultados_fuentes = None
+
 # ============================================================================
 # INTERFAZ DE USUARIO - HEADER
 # ============================================================================
@@ -732,8 +1283,8 @@ col_logo, col_titulo = st.columns([1, 4])
 
 with col_logo:
     try:
-        if os.path.exists("logo.png"):
-            logo = Image.open("logo.png")
+        logo = cargar_logo()
+        if logo:
             st.image(logo, width=150)
     except:
         st.markdown("### 📏")
@@ -752,6 +1303,7 @@ with col3:
         st.session_state.user_email = None
         st.session_state.pedidos = []
         st.session_state.resultados = None
+        st.session_state.resultados_stats = None
         st.session_state.resultados_fuentes = None
         st.rerun()
 
@@ -810,7 +1362,6 @@ with st.sidebar:
             nuevo_pedido = Pedido(largo_pieza, cantidad)
             st.session_state.pedidos.append(nuevo_pedido)
             st.success(f"✅ Agregado: {cantidad}× {largo_pieza}m")
-            st.rerun()
     
     st.markdown("---")
     
@@ -818,10 +1369,14 @@ with st.sidebar:
     if st.session_state.pedidos:
         st.markdown("### 📦 Cortes Actuales")
         
-        pedidos_df = pd.DataFrame([
-            {"Largo (m)": p.largo, "Cantidad": p.cantidad, "Total (m)": p.largo * p.cantidad}
-            for p in st.session_state.pedidos
-        ])
+        pedidos = st.session_state.pedidos
+        largos = np.fromiter((p.largo for p in pedidos), dtype=np.float64, count=len(pedidos))
+        cantidades = np.fromiter((p.cantidad for p in pedidos), dtype=np.int64, count=len(pedidos))
+        pedidos_df = pd.DataFrame({
+            "Largo (m)": largos,
+            "Cantidad": cantidades,
+            "Total (m)": largos * cantidades
+        })
         
         st.dataframe(
             pedidos_df,
@@ -830,17 +1385,14 @@ with st.sidebar:
         )
         
         # Resumen de pedidos
-        total_piezas = sum(p.cantidad for p in st.session_state.pedidos)
-        total_metros = sum(p.largo * p.cantidad for p in st.session_state.pedidos)
+        total_piezas = int(cantidades.sum())
+        total_metros = float(pedidos_df["Total (m)"].sum())
         
         st.info(f"**Total:** {total_piezas} piezas • {total_metros:.2f}m")
         
-        # Botón para limpiar pedidos
-        if st.button("🗑️ Limpiar Lista", use_container_width=True):
-            st.session_state.pedidos = []
-            st.session_state.resultados = None
-            st.session_state.resultados_fuentes = None
-            st.rerun()
+        # Botón para limpiar pedidos: el callback corre antes de la
+        # siguiente ejecución, así la lista ya se dibuja vacía
+        st.button("🗑️ Limpiar Lista", use_container_width=True, on_click=limpiar_pedidos)
     else:
         st.info("No hay cortes agregados")
     
@@ -873,6 +1425,12 @@ with st.sidebar:
             key="fuentes_disponibles"
         )
         
+        # Validar la lista cuando se escribe, no recién al calcular
+        try:
+            _parsear_fuentes(fuentes_input)
+        except ValueError:
+            st.error("⚠️ Las potencias deben ser números separados por comas")
+        
         factor_seguridad = st.slider(
             "Factor de seguridad (%)",
             min_value=5,
@@ -896,69 +1454,29 @@ with st.sidebar:
     if st.button("🚀 Calcular Optimización", type="primary", use_container_width=True, disabled=len(st.session_state.pedidos) == 0):
         with st.spinner("Calculando la distribución óptima..."):
             # Calcular optimización de cortes
-            rollos = first_fit_decreasing(st.session_state.pedidos, longitud_rollo)
+            rollos = first_fit_decreasing_cacheado(st.session_state.pedidos, longitud_rollo)
             st.session_state.resultados = rollos
+            st.session_state.resultados_stats = calcular_estadisticas_rollos(rollos)
+            st.session_state.resultados_version += 1
             
             # Calcular fuentes si está habilitado
             if st.session_state.calcular_fuentes_enabled:
                 try:
                     # Parsear fuentes disponibles
-                    fuentes_disponibles = sorted([float(w.strip()) 
-                                                 for w in st.session_state.fuentes_disponibles.split(',') 
-                                                 if w.strip()])
+                    fuentes_disponibles = _parsear_fuentes(st.session_state.fuentes_disponibles)
                     
                     if fuentes_disponibles:
                         factor = st.session_state.factor_seguridad / 100 + 1
                         watts_metro = st.session_state.watts_per_meter
                         
-                        # Crear diccionario de pedidos para cálculo de fuentes
-                        pedidos_dict = {}
-                        for p in st.session_state.pedidos:
-                            pedidos_dict[p.largo] = pedidos_dict.get(p.largo, 0) + p.cantidad
-                        
-                        if st.session_state.modo_asignacion_fuentes == "Una fuente por corte":
-                            # Modo individual
-                            conteo_fuentes = collections.defaultdict(int)
-                            detalles = []
-                            
-                            for largo, cant in pedidos_dict.items():
-                                consumo = largo * watts_metro
-                                fuente, advertencia = obtener_fuente_adecuada_individual(
-                                    consumo, fuentes_disponibles, factor
-                                )
-                                
-                                if fuente:
-                                    conteo_fuentes[fuente] += cant
-                                    detalles.append({
-                                        "Largo (m)": f"{largo:.2f}",
-                                        "Cantidad": cant,
-                                        "Consumo por Pieza (W)": f"{consumo:.2f}",
-                                        "Consumo Ajustado (W)": f"{consumo * factor:.2f}",
-                                        "Fuente Asignada (W)": f"{fuente:.0f}",
-                                        "Estado": advertencia if advertencia else "✅ OK"
-                                    })
-                            
-                            st.session_state.resultados_fuentes = {
-                                "modo": "individual",
-                                "conteo": conteo_fuentes,
-                                "detalles": detalles
-                            }
-                        
-                        else:
-                            # Modo optimizado con estadísticas mejoradas
-                            conteo, detalles, estadisticas = optimizar_fuentes_agrupadas(
-                                st.session_state.pedidos,
-                                watts_metro,
-                                fuentes_disponibles,
-                                factor
-                            )
-                            
-                            st.session_state.resultados_fuentes = {
-                                "modo": "optimizado",
-                                "conteo": conteo,
-                                "detalles": detalles,
-                                "estadisticas": estadisticas
-                            }
+                        pedidos_tuple = tuple((p.largo, p.cantidad) for p in st.session_state.pedidos)
+                        st.session_state.resultados_fuentes = _fuentes_cached(
+                            pedidos_tuple,
+                            watts_metro,
+                            fuentes_disponibles,
+                            factor,
+                            st.session_state.modo_asignacion_fuentes
+                        )
                     else:
                         st.warning("No se pudieron procesar las fuentes disponibles")
                         st.session_state.resultados_fuentes = None
@@ -970,7 +1488,6 @@ with st.sidebar:
                 st.session_state.resultados_fuentes = None
         
         st.success("✅ Optimización completada")
-        st.rerun()
     
     st.markdown("---")
     st.markdown("""
@@ -1041,359 +1558,11 @@ if st.session_state.resultados is None:
         """)
 
 else:
-    # Mostrar resultados de optimización
-    rollos = st.session_state.resultados
-    
-    # Calcular métricas totales
-    total_rollos = len(rollos)
-    desperdicio_total = sum(r.desperdicio for r in rollos)
-    eficiencia_promedio = sum(r.eficiencia for r in rollos) / len(rollos) if rollos else 0
-    metros_utilizados = sum(r.espacio_usado for r in rollos)
-    
-    # Métricas principales
-    st.markdown("## 📊 Resultados de Optimización")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            label="Rollos Utilizados",
-            value=total_rollos,
-            delta="Optimizado" if total_rollos > 0 else None
-        )
-    
-    with col2:
-        st.metric(
-            label="Desperdicio Total",
-            value=f"{desperdicio_total:.2f}m",
-            delta=f"{(desperdicio_total/metros_utilizados*100):.1f}%" if metros_utilizados > 0 else "0%",
-            delta_color="inverse"
-        )
-    
-    with col3:
-        st.metric(
-            label="Eficiencia Promedio",
-            value=f"{eficiencia_promedio:.1f}%",
-            delta="Excelente" if eficiencia_promedio >= 80 else "Bueno" if eficiencia_promedio >= 60 else "Regular"
-        )
-    
-    with col4:
-        st.metric(
-            label="Material Usado",
-            value=f"{metros_utilizados:.2f}m",
-            delta=f"{len(st.session_state.pedidos)} cortes"
-        )
-    
-    st.markdown('<div class="custom-divider"></div>', unsafe_allow_html=True)
-    
-    # Visualización detallada por rollo
-    st.markdown("## 🎨 Distribución de Cortes")
-    
-    for idx, rollo in enumerate(rollos, 1):
-        with st.container():
-            st.markdown(f'<div class="custom-card">', unsafe_allow_html=True)
-            
-            # Resumen del rollo
-            mostrar_resumen_rollo(rollo, idx)
-            
-            # Visualización gráfica
-            fig = crear_visualizacion_rollo(rollo, idx)
-            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-            
-            st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Tabla detallada de cortes
-    st.markdown("---")
-    st.markdown("## 📋 Detalle Completo de Cortes")
-    
-    # Crear tabla con todos los cortes
-    datos_tabla = []
-    for idx, rollo in enumerate(rollos, 1):
-        for num_pieza, pieza in enumerate(rollo.piezas, 1):
-            datos_tabla.append({
-                "Rollo": f"#{idx}",
-                "Pieza": num_pieza,
-                "Largo (m)": pieza,
-                "Posición": f"{sum(rollo.piezas[:num_pieza-1]):.2f}m - {sum(rollo.piezas[:num_pieza]):.2f}m"
-            })
-    
-    if datos_tabla:
-        df_cortes = pd.DataFrame(datos_tabla)
-        st.dataframe(
-            df_cortes,
-            use_container_width=True,
-            hide_index=True
-        )
-        
-        # Botón de descarga
-        csv = df_cortes.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="⬇️ Descargar Plan de Corte (CSV)",
-            data=csv,
-            file_name="plan_de_corte.csv",
-            mime="text/csv",
-            use_container_width=False
-        )
-    
-    # Análisis adicional
-    st.markdown("---")
-    st.markdown("## 📈 Análisis de Eficiencia")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Gráfico de eficiencia por rollo
-        eficiencias = [r.eficiencia for r in rollos]
-        fig_eficiencia = go.Figure()
-        
-        fig_eficiencia.add_trace(go.Bar(
-            x=[f"Rollo {i+1}" for i in range(len(eficiencias))],
-            y=eficiencias,
-            marker=dict(
-                color=eficiencias,
-                colorscale=[[0, '#ef4444'], [0.5, '#f59e0b'], [1, '#10b981']],
-                showscale=False,
-                line=dict(color='white', width=2)
-            ),
-            text=[f"{e:.1f}%" for e in eficiencias],
-            textposition='outside',
-            textfont=dict(family='JetBrains Mono', size=12, color='#0f172a'),
-            hovertemplate='<b>%{x}</b><br>Eficiencia: %{y:.1f}%<extra></extra>'
-        ))
-        
-        fig_eficiencia.update_layout(
-            title="Eficiencia por Rollo",
-            xaxis_title="Rollo",
-            yaxis_title="Eficiencia (%)",
-            height=300,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family='Work Sans', color='#0f172a'),
-            title_font=dict(size=16, color='#0f172a'),
-            yaxis=dict(range=[0, 100], showgrid=True, gridcolor='#e5e7eb'),
-            xaxis=dict(showgrid=False),
-            margin=dict(l=40, r=40, t=60, b=40)
-        )
-        
-        st.plotly_chart(fig_eficiencia, use_container_width=True, config={'displayModeBar': False})
-    
-    with col2:
-        # Estadísticas resumen
-        st.markdown("### 📊 Estadísticas")
-        
-        mejor_rollo = max(rollos, key=lambda r: r.eficiencia)
-        peor_rollo = min(rollos, key=lambda r: r.eficiencia)
-        
-        st.markdown(f"""
-        - **Mejor rollo:** {rollos.index(mejor_rollo) + 1} ({mejor_rollo.eficiencia:.1f}% eficiencia)
-        - **Peor rollo:** {rollos.index(peor_rollo) + 1} ({peor_rollo.eficiencia:.1f}% eficiencia)
-        - **Desperdicio promedio:** {desperdicio_total/total_rollos:.2f}m por rollo
-        - **Total de piezas:** {sum(len(r.piezas) for r in rollos)} cortadas
-        """)
-        
-        # Indicador de calidad
-        if eficiencia_promedio >= 85:
-            st.success("✅ Excelente optimización - Desperdicio mínimo")
-        elif eficiencia_promedio >= 70:
-            st.info("ℹ️ Buena optimización - Desperdicio aceptable")
-        else:
-            st.warning("⚠️ Optimización mejorable - Considere ajustar los cortes")
+    mostrar_resultados_rollos()
     
     # Resultados de fuentes de energía
     if st.session_state.resultados_fuentes:
-        st.markdown("---")
-        st.markdown("## ⚡ Resultados de Fuentes")
-        
-        res_fuentes = st.session_state.resultados_fuentes
-        
-        # Resumen de fuentes necesarias
-        st.markdown("### 📊 Resumen de Fuentes Necesarias")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            total_fuentes_count = sum(res_fuentes["conteo"].values())
-            st.metric("Total de Fuentes Requeridas", total_fuentes_count)
-            
-            st.markdown("**Desglose por potencia:**")
-            for potencia, cantidad in sorted(res_fuentes["conteo"].items()):
-                st.write(f"- **{potencia:.0f}W**: {cantidad} unidades")
-        
-        with col2:
-            if res_fuentes["modo"] == "individual":
-                st.info("**Modo de asignación:** Una fuente por cada corte")
-                st.markdown("""
-                Cada corte tiene su propia fuente, 
-                asegurando máxima independencia y flexibilidad.
-                """)
-            else:
-                st.success("**Modo de asignación:** Fuentes optimizadas (agrupadas)")
-                st.markdown("""
-                Múltiples cortes agrupados en cada fuente mediante 
-                algoritmo FFD, minimizando el número total de fuentes.
-                """)
-                
-                # Mostrar estadísticas mejoradas solo en modo optimizado
-                if "estadisticas" in res_fuentes:
-                    stats = res_fuentes["estadisticas"]
-                    
-                    st.markdown("---")
-                    st.markdown("**Estadísticas de Eficiencia:**")
-                    st.metric(
-                        "Eficiencia Promedio", 
-                        f"{stats['eficiencia_promedio']:.1f}%",
-                        help="Porcentaje de capacidad utilizada vs capacidad total instalada"
-                    )
-                    
-                    if stats["fuentes_sobrecargadas"] > 0:
-                        st.warning(f"⚠️ {stats['fuentes_sobrecargadas']} fuente(s) sobrecargada(s)")
-                    else:
-                        st.success("✅ Todas las fuentes dentro de capacidad")
-        
-        # Métricas adicionales en modo optimizado
-        if res_fuentes["modo"] == "optimizado" and "estadisticas" in res_fuentes:
-            st.markdown("---")
-            st.markdown("### 📊 Métricas Detalladas de Fuentes")
-            
-            stats = res_fuentes["estadisticas"]
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric(
-                    "Consumo Total Real",
-                    f"{stats['total_consumo_real']:.1f}W",
-                    help="Suma del consumo de todas las piezas"
-                )
-            
-            with col2:
-                st.metric(
-                    "Capacidad Instalada",
-                    f"{stats['total_capacidad_instalada']:.1f}W",
-                    help="Suma de potencia de todas las fuentes asignadas"
-                )
-            
-            with col3:
-                st.metric(
-                    "Capacidad Disponible",
-                    f"{stats['capacidad_desperdiciada']:.1f}W",
-                    delta=f"{(stats['capacidad_desperdiciada']/stats['total_capacidad_instalada']*100):.1f}% spare",
-                    help="Capacidad no utilizada en las fuentes"
-                )
-            
-            with col4:
-                st.metric(
-                    "Total de Piezas",
-                    stats['total_piezas'],
-                    help="Número total de cortes a alimentar"
-                )
-            
-            # Gráfico de distribución de uso de fuentes
-            if res_fuentes["detalles"]:
-                st.markdown("---")
-                st.markdown("### 📈 Distribución de Uso de Fuentes")
-                
-                # Extraer porcentajes de uso
-                usos = []
-                labels = []
-                colors = []
-                
-                for detalle in res_fuentes["detalles"]:
-                    uso_str = detalle["Uso (%)"].replace("%", "")
-                    uso = float(uso_str)
-                    usos.append(uso)
-                    labels.append(detalle["ID"])
-                    
-                    # Color según el estado
-                    if uso >= 90:
-                        colors.append('#f59e0b')  # Amarillo - casi al límite
-                    elif uso >= 70:
-                        colors.append('#10b981')  # Verde - óptimo
-                    else:
-                        colors.append('#3b82f6')  # Azul - subutilizada
-                
-                fig_uso = go.Figure()
-                
-                fig_uso.add_trace(go.Bar(
-                    x=labels,
-                    y=usos,
-                    marker=dict(
-                        color=colors,
-                        line=dict(color='white', width=2)
-                    ),
-                    text=[f"{u:.1f}%" for u in usos],
-                    textposition='outside',
-                    textfont=dict(family='JetBrains Mono', size=11, color='#0f172a'),
-                    hovertemplate='<b>%{x}</b><br>Uso: %{y:.1f}%<br><extra></extra>'
-                ))
-                
-                # Líneas de referencia
-                fig_uso.add_hline(
-                    y=90, line_dash="dash", line_color="#ef4444", 
-                    annotation_text="Límite recomendado (90%)",
-                    annotation_position="right"
-                )
-                fig_uso.add_hline(
-                    y=70, line_dash="dot", line_color="#10b981",
-                    annotation_text="Uso óptimo (70%)",
-                    annotation_position="right"
-                )
-                
-                fig_uso.update_layout(
-                    title="Porcentaje de Uso por Fuente",
-                    xaxis_title="Fuente",
-                    yaxis_title="Uso (%)",
-                    height=350,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(family='Work Sans', color='#0f172a'),
-                    title_font=dict(size=16, color='#0f172a'),
-                    yaxis=dict(range=[0, 110], showgrid=True, gridcolor='#e5e7eb'),
-                    xaxis=dict(showgrid=False),
-                    margin=dict(l=40, r=40, t=80, b=40)
-                )
-                
-                st.plotly_chart(fig_uso, use_container_width=True, config={'displayModeBar': False})
-                
-                # Interpretación de resultados
-                promedio_uso = sum(usos) / len(usos) if usos else 0
-                
-                if promedio_uso >= 85:
-                    st.success("✅ **Excelente optimización:** Las fuentes están bien aprovechadas sin estar sobrecargadas.")
-                elif promedio_uso >= 65:
-                    st.info("ℹ️ **Buena optimización:** Uso equilibrado de las fuentes con margen de seguridad.")
-                else:
-                    st.warning("⚠️ **Optimización mejorable:** Las fuentes están subutilizadas. Considera usar fuentes de menor potencia.")
-        
-        # Detalle de asignación
-        if res_fuentes["detalles"]:
-            st.markdown("---")
-            st.markdown("### 📋 Detalle de Asignación de Fuentes")
-            
-            df_fuentes = pd.DataFrame(res_fuentes["detalles"])
-            
-            # Remover la columna interna de color si existe
-            if "_color" in df_fuentes.columns:
-                df_fuentes = df_fuentes.drop(columns=["_color"])
-            
-            st.dataframe(df_fuentes, use_container_width=True, hide_index=True)
-            
-            # Botón de descarga
-            csv_fuentes = df_fuentes.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="⬇️ Descargar Plan de Fuentes (CSV)",
-                data=csv_fuentes,
-                file_name="plan_de_fuentes.csv",
-                mime="text/csv",
-                use_container_width=False
-            )
-            
-            # Notas importantes
-            st.info("""
-            💡 **Nota importante:** Cada modelo de fuente de poder tiene un máximo de 
-            tiras o metros que puede alimentar según su ficha técnica. Verifica estas 
-            especificaciones antes de la instalación final.
-            """)
+        mostrar_resultados_fuentes()
 
 # ============================================================================
 # FOOTER
@@ -0,0 +1,220 @@
+"""
+NÚCLEOS NUMÉRICOS COMPILADOS
+============================
+Funciones de empaquetado sobre arreglos de NumPy, compiladas con Numba.
+
+Viven fuera de app.py porque Streamlit vuelve a ejecutar el script en
+cada interacción: al importarlas desde un módulo se compilan (o se cargan
+de la caché en disco) una sola vez por proceso.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _actualizar_arbol(arbol: np.ndarray, hojas: int, indice: int, valor) -> None:
+    """
+    Fija el valor de la hoja `indice` en un árbol de máximos y recalcula
+    los máximos de sus ancestros.
+    """
+    i = indice + hojas
+    arbol[i] = valor
+    i //= 2
+    while i >= 1:
+        arbol[i] = max(arbol[2 * i], arbol[2 * i + 1])
+        i //= 2
+
+
+@njit(cache=True)
+def _primero_que_admite(arbol: np.ndarray, hojas: int, valor) -> int:
+    """
+    Busca en un árbol de máximos la primera hoja (la de menor índice) cuyo
+    valor es >= valor.
+    
+    Returns:
+        Índice de la hoja, o -1 si ninguna alcanza
+    """
+    if arbol[1] < valor:
+        return -1
+    i = 1
+    while i < hojas:
+        i *= 2
+        if arbol[i] < valor:
+            i += 1
+    return i - hojas
+
+
+@njit(cache=True)
+def ffd_core(largos: np.ndarray, cantidades: np.ndarray,
+             longitud_rollo) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Núcleo numérico del FFD sobre piezas agrupadas por largo, compilado con Numba.
+    
+    Cada pieza va al primer rollo abierto (en orden de apertura) donde cabe.
+    El espacio libre de los rollos se guarda en un árbol de máximos indexado
+    por id de rollo, así ese primer rollo se localiza en O(log n) sin
+    recorrer los anteriores. Las piezas de un mismo largo toman decisiones
+    idénticas, así que se colocan en bloque: en cada rollo entran tantas
+    como permite su espacio libre y los rollos nuevos se abren de a varios.
+    Los rollos cuyo espacio libre queda por debajo de la pieza más corta se
+    cierran y ya no se consideran.
+    
+    Args:
+        largos: Largos distintos de las piezas ordenados de mayor a menor
+        cantidades: Cantidad de piezas de cada largo
+        longitud_rollo: Longitud del rollo madre (mismas unidades que largos)
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+            (id de rollo, índice de largo y cantidad de cada colocación,
+             espacio libre por rollo)
+    """
+    total = cantidades.sum()
+    seg_rollo = np.empty(total, np.int64)
+    seg_largo = np.empty(total, np.int64)
+    seg_cantidad = np.empty(total, np.int64)
+    restantes = np.empty(total, largos.dtype)
+    n_segmentos = 0
+    n_rollos = 0
+    
+    # Árbol de máximos del espacio libre; las hojas de rollos cerrados o
+    # todavía no abiertos valen -1 y no admiten ninguna pieza
+    hojas = 1
+    while hojas < total:
+        hojas *= 2
+    cerrado = -1
+    arbol = np.full(2 * hojas, cerrado, largos.dtype)
+    
+    # Un rollo con menos espacio que la pieza más corta ya no admite ninguna
+    minimo = largos[largos.shape[0] - 1] if largos.shape[0] > 0 else longitud_rollo
+    
+    for t in range(largos.shape[0]):
+        pieza = largos[t]
+        pendientes = cantidades[t]
+        
+        # Llenar los rollos existentes donde quepa, en orden de apertura
+        while pendientes > 0:
+            id_rollo = _primero_que_admite(arbol, hojas, pieza)
+            if id_rollo < 0:
+                break
+            
+            restante = restantes[id_rollo]
+            k = min(pendientes, max(1, int(restante // pieza)))
+            while k > 1 and k * pieza > restante:
+                k -= 1
+            restante -= k * pieza
+            restantes[id_rollo] = restante
+            
+            seg_rollo[n_segmentos] = id_rollo
+            seg_largo[n_segmentos] = t
+            seg_cantidad[n_segmentos] = k
+            n_segmentos += 1
+            pendientes -= k
+            
+            _actualizar_arbol(arbol, hojas, id_rollo, restante if restante >= minimo else cerrado)
+        
+        if pendientes == 0:
+            continue
+        
+        # No caben en ningún rollo existente: abrir rollos nuevos en bloque
+        por_rollo = max(1, int(longitud_rollo // pieza))
+        while por_rollo > 1 and por_rollo * pieza > longitud_rollo:
+            por_rollo -= 1
+        llenos = pendientes // por_rollo
+        resto = pendientes - llenos * por_rollo
+        
+        restante_lleno = longitud_rollo - por_rollo * pieza
+        for j in range(llenos):
+            restantes[n_rollos] = restante_lleno
+            seg_rollo[n_segmentos] = n_rollos
+            seg_largo[n_segmentos] = t
+            seg_cantidad[n_segmentos] = por_rollo
+            n_segmentos += 1
+            if restante_lleno >= minimo:
+                _actualizar_arbol(arbol, hojas, n_rollos, restante_lleno)
+            n_rollos += 1
+        
+        if resto > 0:
+            restantes[n_rollos] = longitud_rollo - resto * pieza
+            seg_rollo[n_segmentos] = n_rollos
+            seg_largo[n_segmentos] = t
+            seg_cantidad[n_segmentos] = resto
+            n_segmentos += 1
+            if restantes[n_rollos] >= minimo:
+                _actualizar_arbol(arbol, hojas, n_rollos, restantes[n_rollos])
+            n_rollos += 1
+    
+    return (seg_rollo[:n_segmentos], seg_largo[:n_segmentos],
+            seg_cantidad[:n_segmentos], restantes[:n_rollos])
+
+
+@njit(cache=True)
+def asignar_fuentes(consumos: np.ndarray,
+                    fuentes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Asigna cada pieza a una fuente de poder (FFD), compilado con Numba.
+    
+    Cada pieza va a la primera fuente en uso (en orden de apertura) con
+    capacidad suficiente, localizada en O(log n) con un árbol de máximos de
+    la capacidad restante. Si no cabe en ninguna se abre la fuente más
+    pequeña que la soporta, o la más grande disponible aunque quede
+    sobrecargada. Las fuentes cuya capacidad restante queda por debajo del
+    consumo más chico se cierran y ya no se consideran.
+    
+    Args:
+        consumos: Consumo ajustado de cada pieza, ordenado de mayor a menor
+        fuentes: Potencias disponibles ordenadas de menor a mayor
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            (id de fuente por pieza, índice de potencia por fuente,
+             capacidad restante por fuente)
+    """
+    n = consumos.shape[0]
+    asignacion = np.full(n, -1, np.int64)
+    tipos = np.empty(n, np.int64)
+    restantes = np.empty(n, np.float64)
+    if fuentes.shape[0] == 0:
+        return asignacion, tipos[:0], restantes[:0]
+    
+    # Índice de la fuente más grande, usada cuando ninguna alcanza
+    tipo_maximo = fuentes.shape[0] - 1
+    
+    # Una fuente con menos capacidad que el consumo más chico ya no admite ninguna
+    minimo = consumos[n - 1] if n > 0 else 0.0
+    
+    # Árbol de máximos de la capacidad restante por id de fuente; las hojas
+    # de fuentes cerradas o todavía no abiertas valen -inf
+    hojas = 1
+    while hojas < n:
+        hojas *= 2
+    cerrada = -np.inf
+    arbol = np.full(2 * hojas, cerrada, np.float64)
+    n_fuentes = 0
+    
+    for i in range(n):
+        consumo = consumos[i]
+        
+        # Primera fuente abierta (en orden de apertura) con capacidad suficiente
+        id_fuente = _primero_que_admite(arbol, hojas, consumo)
+        
+        if id_fuente >= 0:
+            restantes[id_fuente] -= consumo
+        else:
+            # Abrir la fuente más pequeña que soporte el consumo
+            tipo = np.searchsorted(fuentes, consumo)
+            if tipo > tipo_maximo:
+                tipo = tipo_maximo
+            id_fuente = n_fuentes
+            tipos[id_fuente] = tipo
+            restantes[id_fuente] = fuentes[tipo] - consumo
+            n_fuentes += 1
+        
+        restante = restantes[id_fuente]
+        _actualizar_arbol(arbol, hojas, id_fuente, restante if restante >= minimo else cerrada)
+        asignacion[i] = id_fuente
+    
+    return asignacion, tipos[:n_fuentes], restantes[:n_fuentes]